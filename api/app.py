@@ -1,44 +1,120 @@
 import os
 import re
 import logging
-import json
+import time
 import uuid
-from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
+from datetime import date, datetime
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import TypedDict, Annotated, Sequence, Literal
+from typing import BinaryIO, TypedDict, Annotated, Sequence, Literal
 import operator
 
-from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage, SystemMessage
+import aiofiles
+import orjson
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langchain.tools import tool
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
-
-from paperqa import Docs, Settings
+from langgraph.constants import Send
+from langgraph.checkpoint.aiosqlite import AsyncSqliteSaver
 
 # Make sure to initialize settings first
 from settings import settings as app_settings
 from prompts import prompts
+from common import build_pqa_answer, warm_docs_cache
 
 app = FastAPI()
 
 # --- Logging Setup ---
-now = datetime.now(ZoneInfo('Asia/Tokyo'))
-log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs', now.strftime('%Y'), now.strftime('%m'))
-os.makedirs(log_dir, exist_ok=True)
-log_file_path = os.path.join(log_dir, f'{now.strftime("%d")}.jsonl')
+TOKYO = ZoneInfo('Asia/Tokyo')
+base_log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs')
+
+@lru_cache(maxsize=1)
+def _log_file_path(day: date) -> str:
+    """Returns this process's log file for a day, creating its directory once."""
+    log_dir = os.path.join(base_log_dir, day.strftime('%Y'), day.strftime('%m'))
+    os.makedirs(log_dir, exist_ok=True)
+    # One file per process so multiple uvicorn workers never contend on the same file
+    return os.path.join(log_dir, f'{day.strftime("%d")}-{os.getpid()}.jsonl')
+
+class DailyFileHandler(logging.Handler):
+    """Appends each record's pre-encoded JSON bytes to logs/YYYY/MM/DD-<pid>.jsonl.
+
+    The file is chosen by the Tokyo date the record was created. Bytes messages
+    are written as-is, so a line is serialized exactly once (by orjson); str
+    messages are UTF-8 encoded.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._path: str | None = None
+        self._stream: BinaryIO | None = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            path = _log_file_path(datetime.fromtimestamp(record.created, TOKYO).date())
+            if path != self._path:
+                if self._stream is not None:
+                    self._stream.close()
+                self._stream = open(path, "ab")
+                self._path = path
+            payload = record.msg if isinstance(record.msg, bytes) else record.getMessage().encode("utf-8")
+            self._stream.write(payload + b"\n")
+            # Flush so /api/logs never reads a partially written line
+            self._stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        super().close()
+
+class PassThroughQueueHandler(QueueHandler):
+    """Enqueues records untouched; the default prepare() would format bytes payloads to str."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
 rag_logger = logging.getLogger('rag_logger')
 rag_logger.setLevel(logging.INFO)
+# Keep bytes payloads away from root handlers, which would print them as str
+rag_logger.propagate = False
+# Diagnostics go to stderr and never into the JSONL files served by /api/logs
+logger = logging.getLogger('pqa_web')
+logger.setLevel(logging.DEBUG if app_settings.debug else logging.INFO)
+# Already written to stderr by diagnostics_handler; don't repeat through uvicorn's root handlers
+logger.propagate = False
+log_listener: QueueListener | None = None
 # Prevent duplicate handlers
 if not rag_logger.handlers:
-    handler = logging.FileHandler(log_file_path)
-    handler.setFormatter(logging.Formatter('%(message)s'))
-    rag_logger.addHandler(handler)
+    handler = DailyFileHandler()
+    handler.addFilter(logging.Filter('rag_logger'))
+    diagnostics_handler = logging.StreamHandler()
+    diagnostics_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    diagnostics_handler.addFilter(logging.Filter('pqa_web'))
+    # File and stderr writes happen on the listener's background thread, off the request path
+    log_queue: Queue = Queue(-1)
+    log_listener = QueueListener(log_queue, handler, diagnostics_handler)
+    log_listener.start()
+    rag_logger.addHandler(PassThroughQueueHandler(log_queue))
+    logger.addHandler(PassThroughQueueHandler(log_queue))
+
+@app.on_event("shutdown")
+def stop_log_listener():
+    """Flushes queued log records to disk before the process exits."""
+    if log_listener is not None:
+        log_listener.stop()
 # --- End Logging Setup ---
 
 # Configure CORS
@@ -48,22 +124,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Session-Id"],
 )
 
 # --- PaperQA Tool Definition ---
 
-# Cache for the Docs object to avoid re-indexing
-docs_instance = None
-
-def clean_answer_text(text: str) -> str:
-    """A utility function to clean the answer text from paperqa."""
-    if not text:
-        return ""
-    text = str(text)
-    text = re.sub(r'^Question:.*\n', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\n\nReferences.*$', '', text, flags=re.DOTALL)
-    text = re.sub(r'\n\s*\n', '\n\n', text)
-    return text.strip()
+@app.on_event("startup")
+async def load_docs_from_disk_cache():
+    """Builds the index from cached embeddings so each worker starts warm without re-embedding."""
+    await warm_docs_cache()
 
 @tool
 async def paperqa_query(query: str) -> str:
@@ -72,70 +141,32 @@ async def paperqa_query(query: str) -> str:
     Use this tool ONLY when the user asks a specific question about the content of their documents.
     For general conversation, do not use this tool.
     """
-    global docs_instance
-    print(f"--- Calling PaperQA Tool with query: {query} ---")
-    
-    try:
-        papers_dir = app_settings.papers_directory
-        if not os.path.exists(papers_dir):
-            return "Error: Could not find the 'my_papers' directory."
-        
-        pdf_files = [f for f in os.listdir(papers_dir) if f.endswith('.pdf')]
-        if not pdf_files:
-            return "Error: Could not find any PDF files in the 'my_papers' directory."
-
-        # Initialize Docs object only if it hasn't been initialized or if files changed
-        current_files = set(pdf_files)
-        if docs_instance is None or getattr(docs_instance, '_indexed_files', set()) != current_files:
-            print("Initializing or updating PaperQA Docs index...")
-            os.environ["GEMINI_API_KEY"] = app_settings.gemini_api_key
-            os.environ["GOOGLE_API_KEY"] = app_settings.gemini_api_key
-            
-            pqa_settings = Settings(
-                llm=f"gemini/{app_settings.llm_name}",
-                summary_llm=f"gemini/{app_settings.llm_name}",
-                embedding=f"gemini/{app_settings.embedding_name}",
-            )
-            
-            # Initialize Docs without constructor args
-            temp_docs = Docs()
-            
-            # Add files with settings
-            for pdf_file in pdf_files:
-                pdf_path = os.path.join(papers_dir, pdf_file)
-                await temp_docs.aadd(pdf_path, settings=pqa_settings)
-            
-            # Cache the instance
-            docs_instance = temp_docs
-            setattr(docs_instance, '_indexed_files', current_files)
-            print("PaperQA Docs index updated.")
-
-        # Query the cached documents, passing settings again
-        pqa_settings_for_query = Settings(
-            llm=f"gemini/{app_settings.llm_name}",
-            summary_llm=f"gemini/{app_settings.llm_name}",
-            embedding=f"gemini/{app_settings.embedding_name}",
-        )
-        answer_response = await docs_instance.aquery(query, settings=pqa_settings_for_query)
-        
-        final_answer_text = getattr(answer_response, 'answer', str(answer_response))
-        cleaned_answer = clean_answer_text(final_answer_text)
-
-        if not cleaned_answer or cleaned_answer.lower() in ["none", "", "i cannot answer."]:
-            return "I could not find a relevant answer in the documents for your query."
-        
-        return cleaned_answer
-
-    except Exception as e:
-        print(f"Error in paperqa_tool: {e}")
-        import traceback
-        traceback.print_exc()
-        return "An error occurred while searching the documents."
+    logger.debug("Calling PaperQA tool with query: %s", query)
+    return await build_pqa_answer(query)
 
 # --- LangGraph Agent Definition ---
 
+def _collect_results(left: list, right: list | None) -> list:
+    """Appends results from parallel workers; a None update starts a new batch."""
+    if right is None:
+        return []
+    return left + right
+
+class WorkerState(TypedDict):
+    # Position of the sub-query in the plan, used to put answers back in order
+    index: int
+    query: str
+    tool_call_id: str
+
+class WorkerResult(WorkerState):
+    answer: str
+
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], operator.add]
+    # Independent sub-queries planned from the latest tool call
+    sub_queries: list[WorkerState]
+    # Answers produced by the parallel PaperQA workers for the current batch
+    pqa_results: Annotated[list[WorkerResult], _collect_results]
 
 tools = [paperqa_query]
 
@@ -144,11 +175,22 @@ tools = [paperqa_query]
 model = ChatGoogleGenerativeAI(model=app_settings.llm_name, google_api_key=app_settings.gemini_api_key)
 model_with_tools = model.bind_tools(tools)
 
-def should_continue(state: AgentState) -> Literal["call_tool", "__end__"]:
-    """Decides whether to call a tool or end the conversation."""
+# Splitting stops here so one long prompt cannot exhaust the embedding rate limit
+MAX_SUB_QUERIES = 4
+_SUB_QUESTION_RE = re.compile(r'[^?？\n]+[?？]')
+
+def _split_sub_queries(query: str) -> list[str]:
+    """Splits a prompt made only of several questions into those questions."""
+    parts = [part.strip() for part in _SUB_QUESTION_RE.findall(query)]
+    if 1 < len(parts) <= MAX_SUB_QUERIES and not _SUB_QUESTION_RE.sub("", query).strip():
+        return parts
+    return [query]
+
+def should_continue(state: AgentState) -> Literal["plan", "__end__"]:
+    """Plans the PaperQA lookups if the model asked for the tool, or ends the conversation."""
     last_message = state['messages'][-1]
     if last_message.tool_calls:
-        return "call_tool"
+        return "plan"
     return "__end__"
 
 async def call_model(state: AgentState):
@@ -157,43 +199,151 @@ async def call_model(state: AgentState):
     response = await model_with_tools.ainvoke(messages)
     return {"messages": [response]}
 
+def plan_queries(state: AgentState):
+    """Breaks the tool call's query into sub-queries that can be answered independently.
+
+    Gemini only emits one function call per turn, so the fan-out happens here
+    rather than in the model's response.
+    """
+    sub_queries: list[WorkerState] = []
+    for call in state['messages'][-1].tool_calls:
+        for query in _split_sub_queries(call["args"]["query"]):
+            sub_queries.append({"index": len(sub_queries), "query": query, "tool_call_id": call["id"]})
+    return {"sub_queries": sub_queries, "pqa_results": None}
+
+def dispatch_workers(state: AgentState) -> list[Send]:
+    """Fans out one PaperQA worker per planned sub-query."""
+    return [Send("paperqa_worker", sub_query) for sub_query in state["sub_queries"]]
+
+async def paperqa_worker(state: WorkerState, config: RunnableConfig):
+    """Answers a single sub-query; sibling workers run concurrently."""
+    answer = await paperqa_query.ainvoke(state["query"], config=config)
+    return {"pqa_results": [{**state, "answer": answer}]}
+
+def combine_results(state: AgentState):
+    """Joins the worker answers into one ToolMessage per tool call, in plan order."""
+    answers: dict[str, list[WorkerResult]] = {}
+    for result in sorted(state["pqa_results"], key=lambda r: r["index"]):
+        answers.setdefault(result["tool_call_id"], []).append(result)
+
+    messages = []
+    for call_id, results in answers.items():
+        if len(results) == 1:
+            content = results[0]["answer"]
+        else:
+            content = "\n\n".join(f"Q: {r['query']}\nA: {r['answer']}" for r in results)
+        messages.append(ToolMessage(content=content, name=paperqa_query.name, tool_call_id=call_id))
+    return {"messages": messages}
+
+# Cheap routing heuristics that let obvious inputs skip the agent's tool-decision call
+_GREETING_RE = re.compile(
+    r'^\s*(こんにちは|こんばんは|おはよう(ございます)?|はじめまして|よろしく(お願いします)?'
+    r'|hi|hello|hey)[\s!！。、.〜~]*$',
+    re.IGNORECASE,
+)
+_THANKS_RE = re.compile(
+    r'^\s*(ありがとう(ございます|ございました)?|thanks|thank you)[\s!！。、.〜~]*$',
+    re.IGNORECASE,
+)
+_DOC_TOPIC_RE = re.compile(
+    r'論文|ドキュメント|文書|資料|要約|手法|方法論|結論|実験|著者'
+    r'|paper|document|summar|method|conclusion|experiment|author',
+    re.IGNORECASE,
+)
+_QUESTION_RE = re.compile(
+    r'[?？]|教えて|とは|何|どう|なぜ|要約して|まとめて|説明して'
+    r'|\b(what|how|why|which|explain|describe|summari[sz]e)\b',
+    re.IGNORECASE,
+)
 
-# Define the pre-built ToolNode
-tool_node = ToolNode(tools)
+def classify(state: AgentState):
+    """Answers greetings directly and sends clear document questions straight to PaperQA.
 
+    Anything ambiguous is left for the agent, which pays one LLM round-trip to decide.
+    """
+    question = state['messages'][-1].content
+    if _GREETING_RE.match(question):
+        return {"messages": [AIMessage(content=prompts.greeting_reply)]}
+    if _THANKS_RE.match(question):
+        return {"messages": [AIMessage(content=prompts.thanks_reply)]}
+    if _DOC_TOPIC_RE.search(question) and _QUESTION_RE.search(question):
+        args = {"query": question}
+        tool_call = {"name": paperqa_query.name, "args": args, "id": f"call_{uuid.uuid4().hex}"}
+        # langchain-google-genai sends the call to Gemini from additional_kwargs, not tool_calls
+        function_call = {"name": paperqa_query.name, "arguments": orjson.dumps(args).decode()}
+        return {"messages": [AIMessage(
+            content="",
+            tool_calls=[tool_call],
+            additional_kwargs={"function_call": function_call},
+        )]}
+    # LangGraph rejects an empty update, so write a no-op value
+    return {"pqa_results": None}
+
+def route_after_classify(state: AgentState) -> Literal["agent", "plan", "__end__"]:
+    """Continues from whatever classify decided, or hands the question to the agent."""
+    if isinstance(state['messages'][-1], HumanMessage):
+        return "agent"
+    return should_continue(state)
 
 
 # Define the graph
 workflow = StateGraph(AgentState)
+workflow.add_node("classify", classify)
 workflow.add_node("agent", call_model)
-workflow.add_node("call_tool", tool_node)
+workflow.add_node("plan", plan_queries)
+workflow.add_node("paperqa_worker", paperqa_worker)
+workflow.add_node("combine", combine_results)
 
-workflow.set_entry_point("agent")
+workflow.set_entry_point("classify")
+workflow.add_conditional_edges(
+    "classify",
+    route_after_classify,
+    {
+        "agent": "agent",
+        "plan": "plan",
+        "__end__": "__end__"
+    }
+)
 workflow.add_conditional_edges(
     "agent",
     should_continue,
     {
-        "call_tool": "call_tool",
+        "plan": "plan",
         "__end__": "__end__"
     }
 )
-workflow.add_edge('call_tool', 'agent')
+workflow.add_conditional_edges("plan", dispatch_workers, ["paperqa_worker"])
+workflow.add_edge('paperqa_worker', 'combine')
+workflow.add_edge('combine', 'agent')
+
+# Persist conversation state per session so follow-up turns resume where they left off
+memory = AsyncSqliteSaver.from_conn_string(app_settings.agent_state_db)
+app_graph = workflow.compile(checkpointer=memory)
+
+@app.on_event("startup")
+async def open_agent_state():
+    """Opens the checkpoint database on this worker's event loop."""
+    await memory.setup()
 
-app_graph = workflow.compile()
+@app.on_event("shutdown")
+async def close_agent_state():
+    """Closes the checkpoint database connection."""
+    if memory.is_setup:
+        await memory.conn.close()
 
 # --- API Endpoints ---
 
 class ChatRequest(BaseModel):
     question: str
+    # Conversation thread to resume; a new one is started when omitted
     session_id: str | None = None
-    # We can add chat_history here in the future
-    # chat_history: list[dict] | None = None
 
 @app.post("/api/chat")
 async def chat_with_papers(request: ChatRequest):
     """
     Receives a question, uses the LangGraph agent to decide whether to
-    use the PaperQA tool or respond directly.
+    use the PaperQA tool or respond directly, and streams the answer back
+    as plain text.
     """
     if not app_settings.gemini_api_key:
         raise HTTPException(status_code=500, detail="API key is not configured on the server.")
@@ -201,53 +351,90 @@ async def chat_with_papers(request: ChatRequest):
     if not request.question:
         raise HTTPException(status_code=400, detail="Question cannot be empty.")
 
-    # For now, each request is a new conversation.
-    # In the future, we can use session_id to retrieve and continue conversations.
-    inputs = {
-        "messages": [
-            SystemMessage(content=prompts.agent_system_prompt),
-            HumanMessage(content=request.question)
-        ]
-    }
-
-    try:
-        # The graph can be streamed or invoked
-        final_state = await app_graph.ainvoke(inputs)
-        
-        # The final answer is the last message from the assistant
-        final_answer = final_state['messages'][-1].content
-        
-        # Determine the source based on whether a tool was used
-        source = "conversational_api"
-        for msg in final_state['messages']:
-            if isinstance(msg, ToolMessage):
+    session_id = request.session_id if request.session_id else str(uuid.uuid4())
+    config = {"configurable": {"thread_id": session_id}}
+
+    # The checkpointer already holds earlier turns (and the system prompt)
+    # for a known session, so only the new question is sent.
+    snapshot = await app_graph.aget_state(config)
+    messages: list[BaseMessage] = [HumanMessage(content=request.question)]
+    if not snapshot.values.get("messages"):
+        messages.insert(0, SystemMessage(content=prompts.agent_system_prompt))
+    inputs = {"messages": messages}
+
+    source = "conversational_api"
+    answer_parts: list[str] = []
+
+    async def answer_chunks():
+        """Yields the assistant's answer as the LLM produces it."""
+        nonlocal source
+        async for event in app_graph.astream_events(inputs, config=config, version="v1"):
+            kind = event["event"]
+            if kind == "on_tool_end":
                 source = "rag_api"
-                break
-
-        session_id = request.session_id if request.session_id else str(uuid.uuid4())
-
-        response_data = {
-            "session_id": session_id,
-            "timestamp": datetime.now(ZoneInfo('Asia/Tokyo')).isoformat(),
-            "question": request.question,
-            "answer": final_answer,
-            "source": source,
-        }
-
-        rag_logger.info(json.dumps(response_data, ensure_ascii=False))
-
-        return JSONResponse(content=response_data)
-
-    except Exception as e:
-        print(f"Error during chat processing: {e}")
-        import traceback
-        traceback.print_exc()
+            elif kind == "on_chain_end" and event["name"] == "classify":
+                # Templated replies from classify don't come from a streaming LLM
+                for msg in (event["data"].get("output") or {}).get("messages", []):
+                    if msg.content and not msg.tool_calls:
+                        answer_parts.append(msg.content)
+                        yield msg.content
+            elif kind == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                # Tool-call chunks carry no text content
+                if content and isinstance(content, str):
+                    answer_parts.append(content)
+                    yield content
+
+    # Run the graph up to the first token before committing to a 200, so a
+    # failure at that point still reaches the client as an HTTP error
+    chunks = answer_chunks()
+    try:
+        first_chunk = await anext(chunks, None)
+    except Exception:
+        logger.exception("Error during chat processing")
         raise HTTPException(status_code=500, detail="An internal error occurred.")
 
-@app.get("/api/logs")
-async def get_logs():
-    all_logs = []
-    base_log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs')
+    async def stream_answer():
+        """Streams the answer from the first token on, then logs it."""
+        try:
+            if first_chunk is not None:
+                yield first_chunk
+                async for chunk in chunks:
+                    yield chunk
+        except Exception:
+            # Headers are already sent; the error can only be reported in-band
+            logger.exception("Error during chat processing")
+            yield "An internal error occurred."
+        finally:
+            await chunks.aclose()
+            if answer_parts:
+                response_data = {
+                    "session_id": session_id,
+                    # orjson serializes datetimes natively (ISO 8601)
+                    "timestamp": datetime.now(TOKYO),
+                    "question": request.question,
+                    "answer": "".join(answer_parts),
+                    "source": source,
+                }
+                # Logged as bytes; DailyFileHandler writes them without re-encoding
+                rag_logger.info(orjson.dumps(response_data))
+
+    # Headers go out before the body, so the session id travels there
+    return StreamingResponse(
+        stream_answer(),
+        media_type="text/plain; charset=utf-8",
+        headers={"X-Session-Id": session_id},
+    )
+
+# Newest-first list of JSONL log files, re-walked at most every few seconds
+LOG_INDEX_TTL_SECONDS = 5.0
+# Bytes read per file access when streaming /api/logs
+LOG_READ_BLOCK_SIZE = 64 * 1024
+_log_index: tuple[float, list[str]] = (float("-inf"), [])
+
+def _list_log_files() -> list[str]:
+    """Walks logs/YYYY/MM/DD.jsonl and returns the files newest first."""
+    log_files = []
     if os.path.exists(base_log_dir):
         for year in sorted(os.listdir(base_log_dir), reverse=True):
             year_dir = os.path.join(base_log_dir, year)
@@ -257,14 +444,55 @@ async def get_logs():
                     if os.path.isdir(month_dir):
                         for filename in sorted(os.listdir(month_dir), reverse=True):
                             if filename.endswith(".jsonl"):
-                                with open(os.path.join(month_dir, filename), "r") as f:
-                                    for line in f:
-                                        try:
-                                            all_logs.append(json.loads(line))
-                                        except json.JSONDecodeError:
-                                            pass
-    return all_logs
+                                log_files.append(os.path.join(month_dir, filename))
+    return log_files
+
+async def _get_log_files() -> list[str]:
+    global _log_index
+    built_at, log_files = _log_index
+    if time.monotonic() - built_at > LOG_INDEX_TTL_SECONDS:
+        log_files = await run_in_threadpool(_list_log_files)
+        _log_index = (time.monotonic(), log_files)
+    return log_files
+
+@app.get("/api/logs")
+async def get_logs():
+    log_files = await _get_log_files()
+
+    async def stream_logs():
+        """Joins the raw JSONL lines into a JSON array without decoding them.
+
+        Files are read in large blocks and each block goes out as one chunk,
+        so memory stays bounded without a thread hop and a send per line.
+        """
+        yield b"["
+        separator = b""
+        for path in log_files:
+            try:
+                async with aiofiles.open(path, "rb") as f:
+                    partial = b""
+                    while True:
+                        block = await f.read(LOG_READ_BLOCK_SIZE)
+                        lines = (partial + block).split(b"\n")
+                        # The last piece may be cut mid-line; finish it with the next block
+                        partial = lines.pop() if block else b""
+                        # Skip blank and truncated lines rather than emit invalid JSON
+                        records = [
+                            line for line in map(bytes.strip, lines)
+                            if line.startswith(b"{") and line.endswith(b"}")
+                        ]
+                        if records:
+                            yield separator + b",".join(records)
+                            separator = b","
+                        if not block:
+                            break
+            except FileNotFoundError:
+                continue
+        yield b"]"
+
+    return StreamingResponse(stream_logs(), media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Workers are separate processes; they share the Docs index through the on-disk cache
+    uvicorn.run("app:app", host="0.0.0.0", port=8000, workers=os.cpu_count())
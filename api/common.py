@@ -0,0 +1,225 @@
+"""PaperQA index cache and question answering shared by the API endpoints."""
+import os
+import re
+import asyncio
+import hashlib
+import logging
+import pickle
+import time
+from typing import NamedTuple
+
+from starlette.concurrency import run_in_threadpool
+
+from paperqa import Docs
+from paperqa.types import Doc, Text
+
+from settings import settings as app_settings, embedding_model, pqa_settings
+
+logger = logging.getLogger('pqa_web.common')
+
+class PdfFile(NamedTuple):
+    name: str
+    path: str
+    mtime_ns: int
+    size: int
+
+# Cache for the Docs object to avoid re-indexing
+docs_instance: Docs | None = None
+# Indexed PDFs with their mtime and size, so edited files also trigger a rebuild
+_indexed_files: set[PdfFile] = set()
+# PDFs that failed to ingest; not retried until their mtime or size changes
+_failed_files: set[PdfFile] = set()
+# Serializes index builds so concurrent requests don't embed the same PDFs twice
+_docs_lock = asyncio.Lock()
+
+# Cached PDF listing: (checked_at, pdf files)
+PDF_LISTING_TTL_SECONDS = 5.0
+_pdf_listing: tuple[float, list[PdfFile]] = (float("-inf"), [])
+
+def _list_pdf_files(papers_dir: str) -> list[PdfFile] | None:
+    """Returns the PDFs in papers_dir, or None if the directory is missing.
+
+    Blocking; call through run_in_threadpool. Uses os.scandir so names and
+    stat results come from the directory walk itself. The listing is reused
+    for a few seconds.
+    """
+    global _pdf_listing
+    checked_at, pdf_files = _pdf_listing
+    now = time.monotonic()
+    if now - checked_at < PDF_LISTING_TTL_SECONDS:
+        return pdf_files
+    try:
+        with os.scandir(papers_dir) as it:
+            entries = [e for e in it if e.is_file() and e.name.endswith('.pdf')]
+            pdf_files = []
+            for entry in entries:
+                stat = entry.stat()
+                pdf_files.append(PdfFile(entry.name, entry.path, stat.st_mtime_ns, stat.st_size))
+    except FileNotFoundError:
+        return None
+    _pdf_listing = (now, pdf_files)
+    return pdf_files
+
+def _vector_cache_path(pdf_path: str) -> str:
+    """Returns the per-file embedding cache path, keyed by the PDF's content hash.
+
+    Blocking (reads and hashes the whole file); call through run_in_threadpool.
+    """
+    with open(pdf_path, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256")
+    # Vectors from a different embedding model must not be reused
+    digest.update(pqa_settings.embedding.encode())
+    return os.path.join(app_settings.vector_cache_directory, f"{digest.hexdigest()[:16]}.pkl")
+
+def _load_cached_doc(cache_path: str) -> tuple[Doc, list[Text]] | None:
+    """Loads a PDF's pickled Doc and embedded chunks, if present."""
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable embedding cache %s: %s", cache_path, e)
+        return None
+
+def _save_cached_doc(cache_path: str, doc: Doc, texts: list[Text]) -> None:
+    """Pickles a PDF's Doc and embedded chunks so restarts don't re-embed it."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump((doc, texts), f)
+        # Atomic rename so a concurrent reader never sees a half-written file
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("Could not write embedding cache %s: %s", cache_path, e)
+
+async def _add_pdf(docs: Docs, pdf_path: str, embed_missing: bool) -> bool:
+    """Adds one PDF to docs, reusing cached embeddings when the file is unchanged.
+
+    Returns False if the PDF is not cached and embed_missing is False.
+    """
+    cache_path = await run_in_threadpool(_vector_cache_path, pdf_path)
+    cached = await run_in_threadpool(_load_cached_doc, cache_path)
+    if cached is not None:
+        doc, texts = cached
+        # Texts already carry embeddings, so no embedding calls are made
+        await docs.aadd_texts(texts, doc, settings=pqa_settings, embedding_model=embedding_model)
+        return True
+    if not embed_missing:
+        return False
+
+    # Parse and embed into a Docs of its own: the shared index may rename the
+    # doc, and this way its Doc and chunks are exactly what gets cached
+    pdf_docs = Docs()
+    await pdf_docs.aadd(pdf_path, settings=pqa_settings, embedding_model=embedding_model)
+    if not pdf_docs.docs:
+        return True
+    doc = next(iter(pdf_docs.docs.values()))
+    texts = pdf_docs.texts
+    # Cache before adding, since aadd_texts renames clashing docnames in place
+    await run_in_threadpool(_save_cached_doc, cache_path, doc, texts)
+    await docs.aadd_texts(texts, doc, settings=pqa_settings, embedding_model=embedding_model)
+    return True
+
+async def get_docs(pdf_files: list[PdfFile], embed_missing: bool = True) -> Docs:
+    """Returns the cached Docs index, rebuilding it only when a PDF is added, removed or modified.
+
+    With embed_missing=False only PDFs found in the embedding cache are
+    indexed; the rest are left for the next call to embed. PDFs that fail to
+    ingest are remembered and skipped until they change on disk.
+    """
+    global docs_instance, _indexed_files, _failed_files
+
+    current_files = set(pdf_files)
+    if docs_instance is not None and _indexed_files | _failed_files == current_files:
+        return docs_instance
+
+    async with _docs_lock:
+        # Another request may have finished indexing while we waited for the lock
+        if docs_instance is not None and _indexed_files | _failed_files == current_files:
+            return docs_instance
+
+        logger.info("Initializing or updating PaperQA Docs index...")
+
+        # Initialize Docs without constructor args
+        new_docs = Docs()
+
+        # Add files concurrently; each aadd is dominated by embedding API latency
+        sem = asyncio.Semaphore(app_settings.ingest_concurrency)
+
+        async def _add(pdf_path: str):
+            async with sem:
+                return await _add_pdf(new_docs, pdf_path, embed_missing)
+
+        # Unchanged files that failed before would only fail again
+        failed_files = _failed_files & current_files
+        to_add = [pdf_file for pdf_file in pdf_files if pdf_file not in failed_files]
+        results = await asyncio.gather(
+            *[_add(pdf_file.path) for pdf_file in to_add],
+            return_exceptions=True,
+        )
+        indexed_files = set()
+        for pdf_file, result in zip(to_add, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to add %s to PaperQA index: %s", pdf_file.name, result)
+                failed_files.add(pdf_file)
+            elif result is True:
+                indexed_files.add(pdf_file)
+            # Files not cached under embed_missing=False stay in neither set,
+            # so the next request embeds them
+        logger.info("PaperQA Docs index updated.")
+
+        # Swap in the fully built index in one step
+        docs_instance, _indexed_files, _failed_files = new_docs, indexed_files, failed_files
+        return docs_instance
+
+async def warm_docs_cache() -> None:
+    """Builds the index from cached embeddings without calling the embedding API."""
+    papers_dir = app_settings.papers_directory
+    pdf_files = await run_in_threadpool(_list_pdf_files, papers_dir)
+    if pdf_files:
+        await get_docs(pdf_files, embed_missing=False)
+
+# Patterns used by clean_answer_text, compiled once at import
+_RE_Q = re.compile(r'^Question:.*\n', re.MULTILINE)
+_RE_REF = re.compile(r'\n\nReferences.*$', re.DOTALL)
+_RE_NL = re.compile(r'\n\s*\n')
+
+def clean_answer_text(text: str) -> str:
+    """A utility function to clean the answer text from paperqa."""
+    if not text:
+        return ""
+    text = str(text)
+    text = _RE_Q.sub('', text)
+    text = _RE_REF.sub('', text)
+    return _RE_NL.sub('\n\n', text).strip()
+
+async def build_pqa_answer(question: str) -> str:
+    """Answers a question from the PDFs in the papers directory using the cached index."""
+    try:
+        papers_dir = app_settings.papers_directory
+        # Filesystem calls run in the threadpool to keep the event loop responsive
+        pdf_files = await run_in_threadpool(_list_pdf_files, papers_dir)
+        if pdf_files is None:
+            return "Error: Could not find the 'my_papers' directory."
+        
+        if not pdf_files:
+            return "Error: Could not find any PDF files in the 'my_papers' directory."
+
+        docs = await get_docs(pdf_files)
+
+        # Query the cached documents, passing settings again
+        answer_response = await docs.aquery(question, settings=pqa_settings, embedding_model=embedding_model)
+        
+        final_answer_text = getattr(answer_response, 'answer', str(answer_response))
+        cleaned_answer = clean_answer_text(final_answer_text)
+
+        if not cleaned_answer or cleaned_answer.lower() in ["none", "", "i cannot answer."]:
+            return "I could not find a relevant answer in the documents for your query."
+        
+        return cleaned_answer
+
+    except Exception:
+        logger.exception("Error while answering from PaperQA")
+        return "An error occurred while searching the documents."
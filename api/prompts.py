@@ -23,6 +23,12 @@ class Prompts:
     conversational_system: str = (
         "あなたはフレンドリーで、簡潔な日本語で応答するアシスタントです。ユーザーからの挨拶や日常会話には、自然で適切な返答をしてください。ドキュメントに関する質問でない場合は、無理に回答を探そうとせず、会話を続けてください。"
     )
+    greeting_reply: str = (
+        "こんにちは！アップロードされた論文やドキュメントについて、何でも質問してください。"
+    )
+    thanks_reply: str = (
+        "どういたしまして！ほかにも論文やドキュメントについて気になることがあれば、いつでも質問してください。"
+    )
     agent_system_prompt: str = (
         "あなたは、ユーザーが提供したドキュメントに関する質問に答えるための、優秀なアシスタントです。そのために`paperqa_query`というツールが与えられています。\n\n"
         "あなたの行動ルールは以下の通りです：\n"
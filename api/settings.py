@@ -1,10 +1,22 @@
 import os
 from dotenv import load_dotenv
 from paperqa import Settings
+from paperqa.llms import LiteLLMEmbeddingModel
 from paperqa.settings import AgentSettings
 
 load_dotenv()
 
+class BatchedLiteLLMEmbeddingModel(LiteLLMEmbeddingModel):
+    """LiteLLM embedding model that sends batch_size chunks per embedding request.
+
+    Settings.embedding_config only reaches litellm.aembedding, which drops it,
+    so the batch size has to live on the model that splits the chunks.
+    """
+    batch_size: int = 16
+
+    async def embed_documents(self, texts: list[str], batch_size: int | None = None) -> list[list[float]]:
+        return await super().embed_documents(texts, batch_size=batch_size or self.batch_size)
+
 class AppSettings:
     def __init__(self):
         self.gemini_api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
@@ -12,12 +24,27 @@ class AppSettings:
             # In a server environment, we might not want to raise an exception at import time
             # but rather handle this gracefully when an API call is made.
             print("警告: 環境変数 'GEMINI_API_KEY' または 'GOOGLE_API_KEY' が設定されていません。")
+        else:
+            # PaperQA (via litellm) reads the key from the environment
+            os.environ.setdefault("GEMINI_API_KEY", self.gemini_api_key)
+            os.environ.setdefault("GOOGLE_API_KEY", self.gemini_api_key)
+
+        # Enables DEBUG-level diagnostic logging (e.g. PQA_DEBUG=1 in development)
+        self.debug = os.getenv("PQA_DEBUG", "").lower() in ("1", "true", "yes")
 
         self.llm_name = "gemini-2.0-flash"
         self.embedding_name = "text-embedding-004"
+        # Max number of PDFs embedded concurrently (bounded to respect API rate limits)
+        self.ingest_concurrency = 8
+        # Chunks per embedding request; Gemini's batchEmbedContents accepts at most 100
+        self.embedding_batch_size = 100
         
         _api_dir = os.path.dirname(os.path.abspath(__file__))
         self.papers_directory = os.path.join(_api_dir, "my_papers")
+        # Per-PDF embedding cache shared by every worker and across restarts
+        self.vector_cache_directory = os.path.expanduser("~/.pqa_cache")
+        # SQLite file holding LangGraph conversation state, keyed by session id
+        self.agent_state_db = os.path.join(_api_dir, "agent_state.db")
 
     def get_paperqa_settings(self):
         from prompts import prompts  # Local import to avoid circular dependency
@@ -40,3 +67,14 @@ class AppSettings:
         return paperqa_settings
 
 settings = AppSettings()
+# Built once and shared by every PaperQA call instead of per request
+pqa_settings = Settings(
+    llm=f"gemini/{settings.llm_name}",
+    summary_llm=f"gemini/{settings.llm_name}",
+    embedding=f"gemini/{settings.embedding_name}",
+)
+# Passed explicitly to PaperQA calls so chunk embeddings are batched
+embedding_model = BatchedLiteLLMEmbeddingModel(
+    name=f"gemini/{settings.embedding_name}",
+    batch_size=settings.embedding_batch_size,
+)
@@ -133,18 +133,34 @@ export function ChatInterface() {
         throw new Error(errorData.detail || "Failed to get response from server")
       }
 
-      const result = await response.json()
-
-      if (result.session_id) {
-        setSessionId(result.session_id);
+      const returnedSessionId = response.headers.get("X-Session-Id")
+      if (returnedSessionId) {
+        setSessionId(returnedSessionId);
       }
 
-      const assistantMessage: Message = {
-        id: crypto.randomUUID(),
-        content: result.answer,
-        role: "assistant",
+      // The answer is streamed as plain text; grow the assistant message as chunks arrive
+      const assistantMessageId = crypto.randomUUID()
+      let started = false
+
+      if (response.body) {
+        const reader = response.body.getReader()
+        const decoder = new TextDecoder()
+        while (true) {
+          const { done, value } = await reader.read()
+          if (done) break
+          const chunk = decoder.decode(value, { stream: true })
+          if (!chunk) continue
+          if (!started) {
+            // Keep the "Thinking..." indicator until the first chunk arrives
+            started = true
+            setMessages((prev) => [...prev, { id: assistantMessageId, content: chunk, role: "assistant" }])
+          } else {
+            setMessages((prev) =>
+              prev.map((msg) => (msg.id === assistantMessageId ? { ...msg, content: msg.content + chunk } : msg)),
+            )
+          }
+        }
       }
-      setMessages((prev) => [...prev, assistantMessage])
       fetchSessions(); // Refresh sessions after sending a message
     } catch (err: any) {
       setError(err.message)